@@ -0,0 +1,192 @@
+"""
+MedCompanion AI Response Cache
+
+Two-tier cache for Gemini responses:
+1. Exact lookup by SHA-256 key of (model, prompt, system prompt)
+2. Semantic fallback by cosine similarity of query embeddings, restricted to
+   entries stored with the same scope (e.g. query type and medication names)
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+
+class LLMCache:
+    """
+    In-memory LRU cache with TTL and embedding-similarity lookup
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl: float = 3600,
+        max_embeddings: int = 256,
+        similarity_threshold: float = 0.92
+    ):
+        """
+        Initialize cache
+
+        Args:
+            max_size: Maximum number of cached responses
+            ttl: Time-to-live for each entry in seconds
+            max_embeddings: Number of most recent embeddings kept for similarity search
+            similarity_threshold: Minimum cosine similarity for a semantic hit
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_embeddings = max_embeddings
+        self.similarity_threshold = similarity_threshold
+
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._embeddings: "OrderedDict[str, Tuple[Hashable, np.ndarray]]" = OrderedDict()
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_keys: List[str] = []
+        self._matrix_scopes: List[Hashable] = []
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def cache_key(model: str, prompt: str, system_prompt: str) -> str:
+        """
+        Build a deterministic cache key
+
+        Args:
+            model: Model name
+            prompt: Normalized user prompt
+            system_prompt: System prompt used for generation
+
+        Returns:
+            SHA-256 hex digest
+        """
+        payload = json.dumps(
+            {"model": model, "prompt": prompt, "system_prompt": system_prompt},
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _lookup(self, key: str) -> Optional[Any]:
+        """Return a live entry and mark it recently used (caller holds lock)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def _remove(self, key: str):
+        """Drop an entry and its embedding (caller holds lock)"""
+        self._entries.pop(key, None)
+        if self._embeddings.pop(key, None) is not None:
+            self._matrix = None
+
+    async def get(self, key: str) -> Optional[Any]:
+        """
+        Exact-match lookup
+
+        Args:
+            key: Key from cache_key()
+
+        Returns:
+            Cached value or None
+        """
+        async with self._lock:
+            return self._lookup(key)
+
+    async def get_similar(self, embedding: List[float], scope: Hashable = None) -> Optional[Any]:
+        """
+        Semantic lookup over the most recent cached embeddings
+
+        Only entries stored with an equal scope are candidates, so near-identical
+        questions about different subjects never share an answer.
+
+        Args:
+            embedding: Embedding of the normalized query
+            scope: Scope the cached entry must have been stored with
+
+        Returns:
+            Cached value of the most similar in-scope query above the threshold, or None
+        """
+        query = _normalize(embedding)
+        if query is None:
+            return None
+
+        async with self._lock:
+            if not self._embeddings:
+                return None
+
+            if self._matrix is None:
+                self._matrix_keys = list(self._embeddings.keys())
+                self._matrix_scopes = [entry_scope for entry_scope, _ in self._embeddings.values()]
+                self._matrix = np.vstack([vector for _, vector in self._embeddings.values()])
+
+            # Rows are unit vectors, so the dot product is the cosine similarity
+            similarities = self._matrix @ query
+            in_scope = np.fromiter(
+                (entry_scope == scope for entry_scope in self._matrix_scopes),
+                dtype=bool,
+                count=len(self._matrix_scopes)
+            )
+            similarities = np.where(in_scope, similarities, -np.inf)
+            best = int(np.argmax(similarities))
+            if not similarities[best] > self.similarity_threshold:
+                return None
+
+            return self._lookup(self._matrix_keys[best])
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        embedding: Optional[List[float]] = None,
+        scope: Hashable = None
+    ):
+        """
+        Store a value
+
+        Args:
+            key: Key from cache_key()
+            value: Value to cache
+            embedding: Optional query embedding enabling semantic lookup
+            scope: Scope that get_similar() callers must match to reuse this entry
+        """
+        async with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                oldest, _ = self._entries.popitem(last=False)
+                if self._embeddings.pop(oldest, None) is not None:
+                    self._matrix = None
+
+            vector = _normalize(embedding) if embedding is not None else None
+            if vector is not None:
+                self._embeddings[key] = (scope, vector)
+                self._embeddings.move_to_end(key)
+                while len(self._embeddings) > self.max_embeddings:
+                    self._embeddings.popitem(last=False)
+                self._matrix = None
+
+    async def clear(self):
+        """Remove all entries"""
+        async with self._lock:
+            self._entries.clear()
+            self._embeddings.clear()
+            self._matrix = None
+
+
+def _normalize(embedding: List[float]) -> Optional[np.ndarray]:
+    """Convert an embedding to a unit-length float32 vector"""
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    if not norm:
+        return None
+    return vector / norm
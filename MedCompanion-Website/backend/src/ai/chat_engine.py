@@ -5,40 +5,41 @@ Main AI chat system powered by Google Gemini with safety guardrails
 """
 
 import os
-from typing import List, Dict, Optional
-from google import genai
-from google.genai import types
+import re
+import asyncio
+import threading
+from bisect import bisect_right
+from collections import deque
+from typing import TYPE_CHECKING, AsyncIterator, Deque, FrozenSet, List, Dict, Optional, Tuple
+from .cache import LLMCache
 from .guardrails import AIGuardrails, GuardrailResponse, QueryType
 
+if TYPE_CHECKING:
+    from google import genai
 
-class ChatEngine:
-    """
-    AI chat engine with medical guardrails
-    """
-    
-    def __init__(self, api_key: Optional[str] = None):
-        """
-        Initialize chat engine
-        
-        Args:
-            api_key: Google Gemini API key (or set GEMINI_API_KEY env var)
-        """
-        self.api_key = api_key or os.getenv("GEMINI_API_KEY")
-        if not self.api_key:
-            raise ValueError("GEMINI_API_KEY must be provided or set as environment variable")
-        
-        self.client = genai.Client(api_key=self.api_key)
-        self.guardrails = AIGuardrails()
-        self.conversation_history: List[Dict[str, str]] = []
-    
-    def get_system_prompt(self) -> str:
-        """
-        Get the system prompt that defines AI behavior
-        
-        Returns:
-            System prompt string
-        """
-        return """You are MedCompanion AI, a helpful medication information assistant.
+
+# Maximum number of in-flight Gemini requests across all engines (QPM guard)
+MAX_CONCURRENT_REQUESTS = 50
+
+GEMINI_MODEL = 'gemini-2.5-flash'
+EMBEDDING_MODEL = 'text-embedding-004'
+
+# Conversation history bounds (per engine); stored history is at most
+# MAX_HISTORY_TURNS * (MAX_STORED_USER_CHARS + MAX_STORED_RESPONSE_CHARS) chars
+MAX_HISTORY_TURNS = 6               # Exchanges kept and sent as context
+MAX_STORED_USER_CHARS = 1000        # Per stored user message
+MAX_STORED_RESPONSE_CHARS = 2000    # Per stored assistant response
+HISTORY_TOKEN_BUDGET = 2000         # Estimated history tokens sent per request
+CHARS_PER_TOKEN = 4                 # Rough token estimate for English text
+
+# Batch job states after which results will not change
+BATCH_FINAL_STATES = frozenset({
+    "JOB_STATE_SUCCEEDED", "JOB_STATE_PARTIALLY_SUCCEEDED", "JOB_STATE_FAILED",
+    "JOB_STATE_CANCELLED", "JOB_STATE_EXPIRED"
+})
+
+# System prompt that defines AI behavior
+_SYSTEM_PROMPT = """You are MedCompanion AI, a helpful medication information assistant.
 
 **YOUR ROLE:**
 - Provide general, factual information about medications
@@ -67,80 +68,436 @@ class ChatEngine:
 - Always include appropriate disclaimers
 
 Remember: You are an information tool, not a replacement for medical professionals."""
+
+# Prompt prefix shared by every request
+_SYSTEM_PREFIX = _SYSTEM_PROMPT + "\n\n"
+
+# Response caches shared by all engines. Chat answers (raw text) and
+# medication info (result dicts) are kept apart so a chat message can never
+# hit a medication-info entry.
+_response_cache = LLMCache()
+_medication_info_cache = LLMCache()
+
+# One Gemini client per API key, reused by every engine in the process
+_clients: Dict[str, "genai.Client"] = {}
+_client_lock = threading.Lock()
+
+
+def _get_client(api_key: str) -> "genai.Client":
+    """
+    Get the shared Gemini client for an API key, creating it on first use
     
-    def chat(self, user_message: str, include_history: bool = True) -> Dict[str, any]:
+    The SDK is imported here rather than at module level so guardrail-only
+    paths (refusals, health checks) never pay its import cost.
+    
+    Args:
+        api_key: Google Gemini API key
+        
+    Returns:
+        Shared genai.Client instance
+    """
+    client = _clients.get(api_key)
+    if client is None:
+        with _client_lock:
+            client = _clients.get(api_key)
+            if client is None:
+                from google import genai
+                client = genai.Client(api_key=api_key)
+                _clients[api_key] = client
+    return client
+
+
+# Words that never identify what a question is about. Every other word (e.g. a
+# medication name) must match exactly before a similar cached answer is reused.
+_SCOPE_STOPWORDS = frozenset({
+    "a", "about", "an", "and", "any", "are", "be", "can", "common", "could", "describe",
+    "do", "does", "effect", "effects", "explain", "for", "give", "how", "i", "in",
+    "info", "information", "is", "it", "its", "know", "me", "more", "my", "of", "on",
+    "or", "please", "side", "some", "tell", "the", "this", "to", "use", "used",
+    "uses", "what", "whats", "with", "work", "works", "you"
+})
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def _cache_scope(normalized: str, query_type: QueryType) -> Tuple[QueryType, FrozenSet[str]]:
+    """
+    Scope a similarity cache hit must share with the current question
+    
+    Args:
+        normalized: Lowercased, whitespace-normalized question
+        query_type: Classification of the question
+        
+    Returns:
+        Tuple of (QueryType, subject words such as medication names)
+    """
+    terms = frozenset(
+        word for word in _WORD_RE.findall(normalized)
+        if len(word) > 1 and word not in _SCOPE_STOPWORDS
+    )
+    return query_type, terms
+
+
+def _medication_query(medication_name: str) -> str:
+    """Question used to screen and describe a single medication"""
+    return f"Provide a brief overview of {medication_name}: what it is, what it's used for, and common side effects."
+
+
+def _estimate_tokens(text: str) -> int:
+    """Cheap token estimate from character count"""
+    return len(text) // CHARS_PER_TOKEN
+
+
+def _clip_at_sentence(text: str, max_chars: int) -> str:
+    """
+    Clip text to at most max_chars, preferring to end on a sentence or line break
+    
+    Args:
+        text: Text to clip
+        max_chars: Maximum length of the result
+        
+    Returns:
+        Clipped text
+    """
+    if len(text) <= max_chars:
+        return text
+    
+    clipped = text[:max_chars]
+    cut = max(clipped.rfind(". "), clipped.rfind("\n"))
+    return clipped[:cut + 1] if cut > 0 else clipped
+
+
+def _binary_search_truncate(entries: List[str], budget: int) -> List[str]:
+    """
+    Keep the most recent entries that fit a token budget
+    
+    Binary-searches the cumulative token counts for the longest suffix that
+    fits. If not even the newest entry fits, it is clipped at a sentence
+    boundary instead of being dropped. With the per-entry caps
+    (MAX_STORED_USER_CHARS, MAX_STORED_RESPONSE_CHARS) no single entry can
+    exceed HISTORY_TOKEN_BUDGET, so the clip is kept only as a safeguard in
+    case those limits change.
+    
+    Args:
+        entries: Rendered history entries, oldest first
+        budget: Maximum estimated tokens
+        
+    Returns:
+        Entries to include, oldest first
+    """
+    # suffix_tokens[k] = estimated tokens of the newest k entries (non-decreasing)
+    suffix_tokens = [0]
+    for entry in reversed(entries):
+        suffix_tokens.append(suffix_tokens[-1] + _estimate_tokens(entry))
+    
+    keep = bisect_right(suffix_tokens, budget) - 1
+    if keep == 0 and entries:
+        return [_clip_at_sentence(entries[-1], budget * CHARS_PER_TOKEN)]
+    return entries[len(entries) - keep:]
+
+
+class _Turn:
+    """One stored user/assistant exchange"""
+    
+    __slots__ = ("u", "a")
+    
+    def __init__(self, u: str, a: str):
+        self.u = u
+        self.a = a
+
+
+class ChatEngine:
+    """
+    AI chat engine with medical guardrails
+    """
+    
+    # Shared across instances so the cap applies process-wide
+    _semaphore: Optional[asyncio.Semaphore] = None
+    
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        cache: Optional[LLMCache] = None,
+        medication_cache: Optional[LLMCache] = None
+    ):
         """
-        Process a chat message with guardrails
+        Initialize chat engine
+        
+        Args:
+            api_key: Google Gemini API key (or set GEMINI_API_KEY env var)
+            cache: Chat response cache (defaults to the process-wide cache)
+            medication_cache: Medication info cache (defaults to the process-wide cache)
+        """
+        self.api_key = api_key or os.getenv("GEMINI_API_KEY")
+        if not self.api_key:
+            raise ValueError("GEMINI_API_KEY must be provided or set as environment variable")
+        
+        self.client = _get_client(self.api_key)
+        self.guardrails = AIGuardrails()
+        self.cache = cache if cache is not None else _response_cache
+        self.medication_cache = medication_cache if medication_cache is not None else _medication_info_cache
+        self.conversation_history: Deque[_Turn] = deque(maxlen=MAX_HISTORY_TURNS)
+    
+    @classmethod
+    def _get_semaphore(cls) -> asyncio.Semaphore:
+        """Lazily create the semaphore limiting concurrent Gemini calls"""
+        if cls._semaphore is None:
+            cls._semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        return cls._semaphore
+    
+    def _remember(self, user_message: str, response: str):
+        """
+        Store an exchange in the bounded conversation history
+        
+        Args:
+            user_message: User's message
+            response: Assistant response (full text is still returned to the caller)
+        """
+        self.conversation_history.append(_Turn(
+            user_message[:MAX_STORED_USER_CHARS],
+            response[:MAX_STORED_RESPONSE_CHARS]
+        ))
+    
+    async def _embed(self, text: str) -> Optional[List[float]]:
+        """
+        Embed text for semantic cache lookup
+        
+        Args:
+            text: Normalized query text
+            
+        Returns:
+            Embedding values, or None if the embedding call failed
+        """
+        try:
+            async with self._get_semaphore():
+                result = await self.client.aio.models.embed_content(
+                    model=EMBEDDING_MODEL,
+                    contents=text
+                )
+            return result.embeddings[0].values
+        except Exception:
+            return None
+    
+    async def _ask(self, prompt: str) -> str:
+        """
+        Send a single prompt to Gemini
+        
+        Args:
+            prompt: Full prompt text
+            
+        Returns:
+            Generated response text
+        """
+        async with self._get_semaphore():
+            response = await self.client.aio.models.generate_content(
+                model=GEMINI_MODEL,
+                contents=prompt
+            )
+        return response.text
+    
+    def get_system_prompt(self) -> str:
+        """
+        Get the system prompt that defines AI behavior
+        
+        Returns:
+            System prompt string
+        """
+        return _SYSTEM_PROMPT
+    
+    def _build_context(self, user_message: str, include_history: bool) -> str:
+        """
+        Build the full prompt for a message
         
         Args:
             user_message: User's question/message
             include_history: Whether to include conversation history
             
         Returns:
-            Dict with response, query_type, and guardrail_decision
+            Prompt text sent to Gemini
         """
-        # Check guardrails first
-        guardrail_response, guardrail_message = self.guardrails.check_guardrails(user_message)
-        query_type = self.guardrails.classify_query(user_message)
+        parts = [_SYSTEM_PREFIX]
+        
+        if include_history and self.conversation_history:
+            parts.append("**Previous conversation:**\n")
+            history = [f"User: {turn.u}\nAssistant: {turn.a}\n\n" for turn in self.conversation_history]
+            parts.extend(_binary_search_truncate(history, HISTORY_TOKEN_BUDGET))
+        
+        parts.append(f"**Current question:**\nUser: {user_message}\n\nAssistant:")
+        return "".join(parts)
+    
+    @staticmethod
+    def classify_and_screen(
+        user_message: str
+    ) -> Tuple[QueryType, GuardrailResponse, Optional[Dict[str, any]]]:
+        """
+        Classify a message and apply guardrails without calling Gemini
+        
+        Args:
+            user_message: User's question/message
+            
+        Returns:
+            Tuple of (QueryType, GuardrailResponse, refusal) where refusal is the
+            complete response dict for refused queries and None otherwise
+        """
+        query_type = AIGuardrails.classify_query(user_message)
+        guardrail_response, _ = AIGuardrails.check_guardrails(user_message, query_type)
         
-        # If query is refused, return refusal message
         if guardrail_response in [GuardrailResponse.REFUSE_MEDICAL_ADVICE, GuardrailResponse.REFUSE_HARMFUL]:
-            refusal = self.guardrails.get_refusal_message(query_type)
-            return {
-                "response": refusal,
-                "query_type": query_type.value,
+            return query_type, guardrail_response, {
+                "response": AIGuardrails.get_refusal_message(query_type),
+                "query_type": query_type.label,
                 "guardrail_decision": guardrail_response.value,
                 "is_refused": True
             }
         
-        # Build conversation context
-        conversation_context = self.get_system_prompt() + "\n\n"
+        return query_type, guardrail_response, None
+    
+    async def chat(self, user_message: str, include_history: bool = True) -> Dict[str, any]:
+        """
+        Process a chat message with guardrails
         
-        if include_history and self.conversation_history:
-            conversation_context += "**Previous conversation:**\n"
-            for msg in self.conversation_history[-6:]:  # Last 3 exchanges
-                conversation_context += f"User: {msg['user']}\nAssistant: {msg['assistant']}\n\n"
+        Args:
+            user_message: User's question/message
+            include_history: Whether to include conversation history
+            
+        Returns:
+            Dict with response, query_type, and guardrail_decision
+        """
+        query_type, guardrail_response, refusal = self.classify_and_screen(user_message)
+        if refusal is not None:
+            return refusal
         
-        conversation_context += f"**Current question:**\nUser: {user_message}\n\nAssistant:"
+        return await self.generate(user_message, query_type, guardrail_response, include_history)
+    
+    async def generate(
+        self,
+        user_message: str,
+        query_type: QueryType,
+        guardrail_response: GuardrailResponse,
+        include_history: bool = True
+    ) -> Dict[str, any]:
+        """
+        Generate a response for a message that already passed classify_and_screen
         
-        try:
-            # Generate AI response using new API
-            response = self.client.models.generate_content(
-                model='gemini-2.5-flash',
-                contents=conversation_context
-            )
-            ai_response = response.text
+        Args:
+            user_message: User's question/message
+            query_type: Classification from classify_and_screen
+            guardrail_response: Guardrail decision from classify_and_screen
+            include_history: Whether to include conversation history
             
-            # Add disclaimer
-            ai_response_with_disclaimer = self.guardrails.add_disclaimer(ai_response, query_type)
+        Returns:
+            Dict with response, query_type, and guardrail_decision
+        """
+        # Answers only depend on the question when no history is sent.
+        # The cache holds raw answer text; the disclaimer is always added for
+        # the current query below.
+        ai_response = None
+        use_cache = not (include_history and self.conversation_history)
+        if use_cache:
+            normalized = " ".join(user_message.lower().split())
+            cache_key = self.cache.cache_key(GEMINI_MODEL, normalized, _SYSTEM_PROMPT)
+            scope = _cache_scope(normalized, query_type)
+            ai_response = await self.cache.get(cache_key)
             
-            # Store in conversation history
-            self.conversation_history.append({
-                "user": user_message,
-                "assistant": ai_response_with_disclaimer
-            })
+            embedding = None
+            if ai_response is None:
+                embedding = await self._embed(normalized)
+                if embedding is not None:
+                    ai_response = await self.cache.get_similar(embedding, scope)
+        
+        if ai_response is None:
+            conversation_context = self._build_context(user_message, include_history)
             
-            return {
-                "response": ai_response_with_disclaimer,
-                "query_type": query_type.value,
-                "guardrail_decision": guardrail_response.value,
-                "is_refused": False
-            }
+            try:
+                # Generate AI response without blocking the event loop
+                ai_response = await self._ask(conversation_context)
+            except Exception as e:
+                return {
+                    "response": f"I apologize, but I encountered an error. Please try again. If the problem persists, contact support.",
+                    "query_type": query_type.label,
+                    "guardrail_decision": "error",
+                    "is_refused": False,
+                    "error": str(e)
+                }
             
-        except Exception as e:
-            return {
-                "response": f"I apologize, but I encountered an error. Please try again. If the problem persists, contact support.",
-                "query_type": query_type.value,
-                "guardrail_decision": "error",
-                "is_refused": False,
-                "error": str(e)
-            }
+            if use_cache:
+                await self.cache.set(cache_key, ai_response, embedding, scope)
+        
+        # Add disclaimer
+        ai_response_with_disclaimer = self.guardrails.add_disclaimer(ai_response, query_type)
+        
+        # Store in conversation history
+        self._remember(user_message, ai_response_with_disclaimer)
+        
+        return {
+            "response": ai_response_with_disclaimer,
+            "query_type": query_type.label,
+            "guardrail_decision": guardrail_response.value,
+            "is_refused": False
+        }
+    
+    async def generate_stream(
+        self,
+        user_message: str,
+        query_type: QueryType,
+        include_history: bool = True
+    ) -> AsyncIterator[str]:
+        """
+        Stream a response for a message that already passed classify_and_screen
+        
+        The disclaimer is not part of the stream; callers send it once the
+        stream completes. The full exchange is stored in history at the end.
+        
+        Args:
+            user_message: User's question/message
+            query_type: Classification from classify_and_screen
+            include_history: Whether to include conversation history
+            
+        Yields:
+            Response text chunks as Gemini produces them
+        """
+        conversation_context = self._build_context(user_message, include_history)
+        
+        # A producer task holds the Gemini slot only while Gemini is sending, so
+        # slow readers cannot starve other requests. The queue is bounded by the
+        # length of one response.
+        queue: asyncio.Queue = asyncio.Queue()
+        
+        async def produce():
+            try:
+                async with self._get_semaphore():
+                    stream = await self.client.aio.models.generate_content_stream(
+                        model=GEMINI_MODEL,
+                        contents=conversation_context
+                    )
+                    async for chunk in stream:
+                        if chunk.text:
+                            queue.put_nowait(chunk.text)
+            except Exception as e:
+                queue.put_nowait(e)
+            else:
+                queue.put_nowait(None)
+        
+        producer = asyncio.create_task(produce())
+        chunks = []
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                chunks.append(item)
+                yield item
+        finally:
+            producer.cancel()
+        
+        self._remember(user_message, self.guardrails.add_disclaimer("".join(chunks), query_type))
     
     def clear_history(self):
         """Clear conversation history"""
-        self.conversation_history = []
+        self.conversation_history.clear()
     
-    def get_medication_info(self, medication_name: str) -> Dict[str, any]:
+    async def get_medication_info(self, medication_name: str) -> Dict[str, any]:
         """
         Get structured information about a specific medication
         
@@ -148,10 +505,154 @@ Remember: You are an information tool, not a replacement for medical professiona
             medication_name: Name of the medication
             
         Returns:
-            Dict with medication information
+            Dict with overview, side_effects, interactions and guardrail information
+        """
+        query = _medication_query(medication_name)
+        query_type = self.guardrails.classify_query(query)
+        guardrail_response, _ = self.guardrails.check_guardrails(query, query_type)
+        
+        result = {
+            "medication_name": medication_name,
+            "overview": "",
+            "side_effects": "",
+            "interactions": "",
+            "query_type": query_type.label,
+            "guardrail_decision": guardrail_response.value,
+            "is_refused": False
+        }
+        
+        if guardrail_response in [GuardrailResponse.REFUSE_MEDICAL_ADVICE, GuardrailResponse.REFUSE_HARMFUL]:
+            result["overview"] = self.guardrails.get_refusal_message(query_type)
+            result["is_refused"] = True
+            return result
+        
+        cache_key = self.medication_cache.cache_key(
+            GEMINI_MODEL,
+            " ".join(medication_name.lower().split()),
+            _SYSTEM_PROMPT
+        )
+        cached = await self.medication_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+        
+        # Independent prompts, issued concurrently so they cost one round-trip
+        prompts = (
+            f"In 2-3 sentences, describe what {medication_name} is and what it is used for.",
+            f"Briefly list the common side effects of {medication_name}.",
+            f"Briefly list the major known drug interactions of {medication_name}.",
+        )
+        
+        try:
+            overview, side_effects, interactions = await asyncio.gather(
+                *(self._ask(_SYSTEM_PREFIX + prompt) for prompt in prompts)
+            )
+        except Exception as e:
+            result["overview"] = "I apologize, but I encountered an error. Please try again. If the problem persists, contact support."
+            result["guardrail_decision"] = "error"
+            result["error"] = str(e)
+            return result
+        
+        result["overview"] = self.guardrails.add_disclaimer(overview, QueryType.MEDICATION_INFO)
+        result["side_effects"] = self.guardrails.add_disclaimer(side_effects, QueryType.SIDE_EFFECTS)
+        result["interactions"] = self.guardrails.add_disclaimer(interactions, QueryType.INTERACTION)
+        
+        await self.medication_cache.set(cache_key, dict(result))
+        return result
+    
+    async def submit_medication_batch(self, medication_names: List[str]) -> Dict[str, any]:
+        """
+        Submit medication overviews as a Gemini Batch Mode job
+        
+        Batch jobs are billed at a discount but complete asynchronously, so this
+        suits bulk, non-interactive workloads. Names refused by the guardrails are
+        answered immediately and not sent to Gemini.
+        
+        Args:
+            medication_names: Names of the medications
+            
+        Returns:
+            Dict with job_name, state, accepted names and refused results
+        """
+        accepted = []
+        refused = []
+        requests = []
+        
+        for medication_name in medication_names:
+            query = _medication_query(medication_name)
+            _, _, refusal = self.classify_and_screen(query)
+            if refusal is not None:
+                refused.append({"medication_name": medication_name, **refusal})
+                continue
+            
+            accepted.append(medication_name)
+            requests.append({
+                "contents": [{"role": "user", "parts": [{"text": _SYSTEM_PREFIX + query}]}],
+                "metadata": {"medication_name": medication_name}
+            })
+        
+        result = {
+            "job_name": None,
+            "state": None,
+            "accepted": accepted,
+            "refused": refused
+        }
+        
+        if requests:
+            job = await self.client.aio.batches.create(
+                model=GEMINI_MODEL,
+                src=requests,
+                config={"display_name": "medcompanion-medication-info"}
+            )
+            result["job_name"] = job.name
+            result["state"] = job.state.name
+        
+        return result
+    
+    async def get_medication_batch(self, job_name: str) -> Dict[str, any]:
         """
-        query = f"Provide a brief overview of {medication_name}: what it is, what it's used for, and common side effects."
-        return self.chat(query, include_history=False)
+        Get the state of a medication batch job and, once finished, its results
+        
+        Results go through the same disclaimer pipeline as interactive answers.
+        
+        Args:
+            job_name: Job name returned by submit_medication_batch
+            
+        Returns:
+            Dict with job_name, state, done and per-medication results
+        """
+        job = await self.client.aio.batches.get(name=job_name)
+        state = job.state.name
+        results = []
+        
+        if state in BATCH_FINAL_STATES and job.dest and job.dest.inlined_responses:
+            for item in job.dest.inlined_responses:
+                medication_name = (item.metadata or {}).get("medication_name", "")
+                query_type = self.guardrails.classify_query(_medication_query(medication_name))
+                
+                if item.error is not None or item.response is None or not item.response.text:
+                    results.append({
+                        "medication_name": medication_name,
+                        "response": "I apologize, but I encountered an error. Please try again. If the problem persists, contact support.",
+                        "query_type": query_type.label,
+                        "guardrail_decision": "error",
+                        "is_refused": False
+                    })
+                    continue
+                
+                results.append({
+                    "medication_name": medication_name,
+                    "response": self.guardrails.add_disclaimer(item.response.text, query_type),
+                    "query_type": query_type.label,
+                    "guardrail_decision": GuardrailResponse.REQUIRE_DISCLAIMER.value,
+                    "is_refused": False
+                })
+        
+        return {
+            "job_name": job.name,
+            "state": state,
+            "done": state in BATCH_FINAL_STATES,
+            "results": results
+        }
 
 
 # Example usage
@@ -177,14 +678,17 @@ if __name__ == "__main__":
         "Tell me about aspirin",
     ]
     
-    for query in test_queries:
-        print(f"\n👤 User: {query}")
-        print("-" * 80)
-        
-        result = chat.chat(query)
-        
-        print(f"🤖 Assistant: {result['response']}")
-        print(f"\n📊 Query Type: {result['query_type']}")
-        print(f"🛡️  Guardrail Decision: {result['guardrail_decision']}")
-        print(f"🚫 Refused: {result['is_refused']}")
-        print("=" * 80)
+    async def run_queries():
+        for query in test_queries:
+            print(f"\n👤 User: {query}")
+            print("-" * 80)
+            
+            result = await chat.chat(query)
+            
+            print(f"🤖 Assistant: {result['response']}")
+            print(f"\n📊 Query Type: {result['query_type']}")
+            print(f"🛡️  Guardrail Decision: {result['guardrail_decision']}")
+            print(f"🚫 Refused: {result['is_refused']}")
+            print("=" * 80)
+    
+    asyncio.run(run_queries())
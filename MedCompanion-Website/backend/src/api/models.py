@@ -2,23 +2,32 @@
 Pydantic models for API requests and responses
 """
 
-from pydantic import BaseModel, Field
-from typing import Optional, List
-from datetime import datetime
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Annotated, Optional, List
+from datetime import datetime, timezone
+
+
+def utc_now() -> datetime:
+    """Current time as a timezone-aware UTC datetime"""
+    return datetime.now(timezone.utc)
 
 
 class ChatRequest(BaseModel):
     """Request model for chat endpoint"""
     message: str = Field(..., min_length=1, max_length=1000, description="User's message")
+    session_id: str = Field(..., min_length=1, max_length=128, description="Conversation session identifier")
     include_history: bool = Field(default=True, description="Include conversation history")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "message": "What is Metformin used for?",
+                "session_id": "Qm9vdHN0cmFwU2Vzc2lvbk5vbmNl.4f1c0e...",
                 "include_history": True
             }
-        }
+        },
+        extra="ignore"
+    )
 
 
 class ChatResponse(BaseModel):
@@ -27,10 +36,10 @@ class ChatResponse(BaseModel):
     query_type: str = Field(..., description="Type of query classified")
     guardrail_decision: str = Field(..., description="Guardrail decision made")
     is_refused: bool = Field(..., description="Whether the query was refused")
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=utc_now)
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "response": "Metformin is used to control blood sugar levels...",
                 "query_type": "medication_info",
@@ -38,23 +47,98 @@ class ChatResponse(BaseModel):
                 "is_refused": False,
                 "timestamp": "2024-01-01T12:00:00"
             }
-        }
+        },
+        extra="ignore",
+        from_attributes=True
+    )
 
 
 class MedicationInfoRequest(BaseModel):
     """Request model for medication info endpoint"""
     medication_name: str = Field(..., min_length=1, max_length=200)
+    session_id: Optional[str] = Field(default=None, max_length=128, description="Conversation session identifier")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "medication_name": "Metformin"
             }
-        }
+        },
+        extra="ignore"
+    )
+
+
+class MedicationInfo(BaseModel):
+    """Response model for medication info endpoint"""
+    medication_name: str = Field(..., description="Name of the medication")
+    overview: str = Field(..., description="What the medication is and what it is used for")
+    side_effects: str = Field(..., description="Common side effects")
+    interactions: str = Field(..., description="Major drug interactions")
+    query_type: str = Field(..., description="Type of query classified")
+    guardrail_decision: str = Field(..., description="Guardrail decision made")
+    is_refused: bool = Field(..., description="Whether the query was refused")
+    timestamp: datetime = Field(default_factory=utc_now)
+    
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "medication_name": "Metformin",
+                "overview": "Metformin is an oral medication used to manage type 2 diabetes...",
+                "side_effects": "Common side effects include nausea, diarrhea...",
+                "interactions": "Alcohol may increase the risk of lactic acidosis...",
+                "query_type": "side_effects",
+                "guardrail_decision": "require_disclaimer",
+                "is_refused": False,
+                "timestamp": "2024-01-01T12:00:00"
+            }
+        },
+        extra="ignore"
+    )
+
+
+class MedicationBatchRequest(BaseModel):
+    """Request model for medication info batch endpoint"""
+    medications: List[Annotated[str, Field(min_length=1, max_length=200)]] = Field(
+        ..., min_length=1, max_length=1000, description="Medication names"
+    )
+    
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "medications": ["Metformin", "Lisinopril", "Aspirin"]
+            }
+        },
+        extra="ignore"
+    )
+
+
+class MedicationBatchResult(BaseModel):
+    """Answer for one medication in a batch"""
+    medication_name: str = Field(..., description="Name of the medication")
+    response: str = Field(..., description="AI assistant's response")
+    query_type: str = Field(..., description="Type of query classified")
+    guardrail_decision: str = Field(..., description="Guardrail decision made")
+    is_refused: bool = Field(..., description="Whether the query was refused")
+
+
+class MedicationBatchResponse(BaseModel):
+    """Response model for medication info batch endpoints"""
+    job_name: Optional[str] = Field(default=None, description="Signed batch job name to poll (None if nothing was submitted)")
+    state: Optional[str] = Field(default=None, description="Gemini batch job state")
+    done: bool = Field(default=False, description="Whether the job has finished")
+    accepted: List[str] = Field(default_factory=list, description="Medications submitted to the batch job")
+    refused: List[MedicationBatchResult] = Field(default_factory=list, description="Medications refused by guardrails")
+    results: List[MedicationBatchResult] = Field(default_factory=list, description="Results, once the job has finished")
+    timestamp: datetime = Field(default_factory=utc_now)
+
+
+class SessionResponse(BaseModel):
+    """Response model for session endpoint"""
+    session_id: str = Field(..., description="Session id to send with chat requests")
 
 
 class HealthCheckResponse(BaseModel):
     """Response model for health check"""
     status: str
     version: str
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=utc_now)
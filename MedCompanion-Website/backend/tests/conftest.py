@@ -0,0 +1,40 @@
+"""
+Shared test fixtures
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+
+class ASGIClient:
+    """
+    Synchronous HTTP client for an ASGI app
+
+    Uses httpx.ASGITransport directly, because the TestClient bundled with
+    FastAPI 0.109 does not work with httpx >= 0.28 (required by google-genai).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        async def send():
+            transport = httpx.ASGITransport(app=self.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+                return await client.request(method, url, **kwargs)
+
+        return asyncio.run(send())
+
+    def get(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("POST", url, **kwargs)
+
+
+@pytest.fixture
+def asgi_client():
+    """Factory building an ASGIClient for an app"""
+    return ASGIClient
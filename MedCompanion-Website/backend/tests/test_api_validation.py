@@ -0,0 +1,86 @@
+"""
+Tests that chat endpoints report invalid bodies in FastAPI's standard 422 format
+"""
+
+import sys
+import os
+
+import pytest
+from fastapi import FastAPI
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.api import main
+from src.api.models import ChatRequest
+
+# Reference app declaring ChatRequest as a regular body parameter
+reference_app = FastAPI()
+
+
+@reference_app.post("/chat")
+async def reference_chat(request: ChatRequest):
+    return {}
+
+
+INVALID_BODIES = [
+    "{}",
+    '{"message": "", "session_id": "s"}',
+    '{"message": 1, "session_id": "s"}',
+    '{"message": "hi", "session_id": "s", "include_history": "maybe"}',
+    "[1]",
+    '"text"',
+    "null",
+    "",
+    "{bad",
+    '{"message": "hi",}',
+]
+
+
+def post(client, path, body):
+    return client.post(path, content=body, headers={"Content-Type": "application/json"})
+
+
+def without_url(detail):
+    return [{k: v for k, v in err.items() if k != "url"} for err in detail]
+
+
+@pytest.mark.parametrize("path", ["/api/chat", "/api/chat/stream"])
+@pytest.mark.parametrize("body", INVALID_BODIES)
+def test_invalid_body_matches_standard_422(asgi_client, path, body):
+    response = post(asgi_client(main.app), path, body)
+    expected = post(asgi_client(reference_app), "/chat", body)
+
+    assert response.status_code == expected.status_code == 422
+    assert response.json() == expected.json()
+
+
+def test_422_format(asgi_client):
+    response = post(asgi_client(main.app), "/api/chat", '{"message": ""}')
+
+    assert response.status_code == 422
+    # Error URLs depend on the installed pydantic version
+    assert without_url(response.json()["detail"]) == [
+        {
+            "type": "string_too_short",
+            "loc": ["body", "message"],
+            "msg": "String should have at least 1 character",
+            "input": "",
+            "ctx": {"min_length": 1},
+        },
+        {
+            "type": "missing",
+            "loc": ["body", "session_id"],
+            "msg": "Field required",
+            "input": {"message": ""},
+        },
+    ]
+
+
+@pytest.mark.parametrize("encoding", ["utf-8-sig", "utf-16"])
+def test_json_encodings_accepted_by_fastapi_are_accepted(asgi_client, encoding):
+    body = f'{{"message": "How can I overdose?", "session_id": "{main.issue_session_id()}"}}'
+    response = post(asgi_client(main.app), "/api/chat", body.encode(encoding))
+
+    assert response.status_code == 200
+    assert response.json()["is_refused"] is True
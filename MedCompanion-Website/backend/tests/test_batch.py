@@ -0,0 +1,164 @@
+"""
+Tests for Gemini Batch Mode medication info
+"""
+
+import sys
+import os
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ai import chat_engine as chat_engine_module
+from src.ai.chat_engine import ChatEngine
+from src.api import main
+
+ADMIN_KEY = "test-admin-key"
+
+
+class FakeBatches:
+    """Stand-in for client.aio.batches"""
+
+    def __init__(self):
+        self.created = []
+        self.jobs = {}
+
+    async def create(self, model, src, config):
+        name = f"batches/job-{len(self.created)}"
+        self.created.append(src)
+        self.jobs[name] = job(name, "JOB_STATE_PENDING")
+        return self.jobs[name]
+
+    async def get(self, name):
+        return self.jobs[name]
+
+
+def job(name, state, inlined_responses=None):
+    return SimpleNamespace(
+        name=name,
+        state=SimpleNamespace(name=state),
+        dest=SimpleNamespace(inlined_responses=inlined_responses) if inlined_responses else None
+    )
+
+
+def inlined(medication_name, text=None, error=None):
+    return SimpleNamespace(
+        metadata={"medication_name": medication_name},
+        response=SimpleNamespace(text=text) if text is not None else None,
+        error=error
+    )
+
+
+@pytest.fixture
+def batches(monkeypatch):
+    fake = FakeBatches()
+    client = SimpleNamespace(aio=SimpleNamespace(batches=fake))
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(chat_engine_module, "_get_client", lambda api_key: client)
+    monkeypatch.setattr(main, "BATCH_API_KEY", ADMIN_KEY)
+    main._engines.clear()
+    yield fake
+    main._engines.clear()
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_submit_splits_refused_and_accepted(batches):
+    engine = ChatEngine()
+    result = run(engine.submit_medication_batch(["Metformin", "how to overdose", "Aspirin"]))
+
+    assert result["job_name"] == "batches/job-0"
+    assert result["state"] == "JOB_STATE_PENDING"
+    assert result["accepted"] == ["Metformin", "Aspirin"]
+    assert [item["medication_name"] for item in result["refused"]] == ["how to overdose"]
+    assert result["refused"][0]["is_refused"] is True
+
+    requests = batches.created[0]
+    assert [request["metadata"] for request in requests] == [
+        {"medication_name": "Metformin"},
+        {"medication_name": "Aspirin"},
+    ]
+
+
+def test_submit_with_only_refused_names_creates_no_job(batches):
+    result = run(ChatEngine().submit_medication_batch(["how to overdose"]))
+    assert result["job_name"] is None
+    assert batches.created == []
+
+
+def test_results_are_mapped_by_metadata(batches):
+    batches.jobs["batches/done"] = job("batches/done", "JOB_STATE_SUCCEEDED", [
+        inlined("Aspirin", text="Aspirin is a pain reliever."),
+        inlined("Metformin", error={"code": 500}),
+    ])
+    result = run(ChatEngine().get_medication_batch("batches/done"))
+
+    assert result["done"] is True
+    aspirin, metformin = result["results"]
+    assert aspirin["medication_name"] == "Aspirin"
+    assert aspirin["response"].startswith("Aspirin is a pain reliever.")
+    assert "Disclaimer" in aspirin["response"]
+    assert aspirin["guardrail_decision"] == "require_disclaimer"
+    assert metformin["medication_name"] == "Metformin"
+    assert metformin["guardrail_decision"] == "error"
+
+
+def test_running_job_has_no_results(batches):
+    batches.jobs["batches/running"] = job("batches/running", "JOB_STATE_RUNNING")
+    result = run(ChatEngine().get_medication_batch("batches/running"))
+    assert result == {
+        "job_name": "batches/running",
+        "state": "JOB_STATE_RUNNING",
+        "done": False,
+        "results": [],
+    }
+
+
+def test_batch_tokens_verify():
+    token = main.issue_batch_token("batches/abc")
+    assert main.verify_batch_token(token) == "batches/abc"
+    assert main.verify_batch_token("batches/abc") is None
+    assert main.verify_batch_token(token.replace("abc", "xyz")) is None
+    # Session ids are signed for a different purpose
+    assert main.verify_batch_token(main.issue_session_id()) is None
+
+
+def test_endpoints_require_admin_key(batches, asgi_client, monkeypatch):
+    client = asgi_client(main.app)
+    body = {"medications": ["Aspirin"]}
+
+    assert client.post("/api/medication-info/batch", json=body).status_code == 401
+    assert client.post(
+        "/api/medication-info/batch", json=body, headers={"X-API-Key": "wrong"}
+    ).status_code == 401
+    assert client.get("/api/medication-info/batch/batches/job-0").status_code == 401
+
+    monkeypatch.setattr(main, "BATCH_API_KEY", None)
+    assert client.post(
+        "/api/medication-info/batch", json=body, headers={"X-API-Key": ""}
+    ).status_code == 403
+    assert batches.created == []
+
+
+def test_only_issued_job_names_can_be_polled(batches, asgi_client):
+    client = asgi_client(main.app)
+    headers = {"X-API-Key": ADMIN_KEY}
+
+    submitted = client.post("/api/medication-info/batch", json={"medications": ["Aspirin"]}, headers=headers)
+    assert submitted.status_code == 200
+    token = submitted.json()["job_name"]
+    assert main.verify_batch_token(token) == "batches/job-0"
+
+    polled = client.get(f"/api/medication-info/batch/{token}", headers=headers)
+    assert polled.status_code == 200
+    assert polled.json()["job_name"] == token
+    assert polled.json()["state"] == "JOB_STATE_PENDING"
+
+    batches.jobs["batches/other"] = job("batches/other", "JOB_STATE_SUCCEEDED")
+    forged = client.get("/api/medication-info/batch/batches/other", headers=headers)
+    assert forged.status_code == 404
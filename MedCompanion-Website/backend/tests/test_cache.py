@@ -0,0 +1,128 @@
+"""
+Tests for the LLM response cache
+"""
+
+import sys
+import os
+import asyncio
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ai import cache as cache_module
+from src.ai.cache import LLMCache
+from src.ai.chat_engine import _cache_scope
+from src.ai.guardrails import QueryType
+
+
+class FakeClock:
+    """Controllable replacement for time.monotonic"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_cache_key_is_deterministic():
+    key = LLMCache.cache_key("model", "what is metformin?", "system")
+    assert key == LLMCache.cache_key("model", "what is metformin?", "system")
+    assert key != LLMCache.cache_key("model", "what is aspirin?", "system")
+    assert key != LLMCache.cache_key("other-model", "what is metformin?", "system")
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    cache = LLMCache(ttl=60)
+
+    async def scenario():
+        await cache.set("k", "answer", [1.0, 0.0])
+        clock.now += 59
+        assert await cache.get("k") == "answer"
+        clock.now += 2
+        assert await cache.get("k") is None
+        # Expired entries are not returned by similarity lookup either
+        assert await cache.get_similar([1.0, 0.0]) is None
+
+    run(scenario())
+
+
+def test_lru_eviction_keeps_recently_used_entries():
+    cache = LLMCache(max_size=2)
+
+    async def scenario():
+        await cache.set("a", "A")
+        await cache.set("b", "B")
+        assert await cache.get("a") == "A"  # "a" is now most recently used
+        await cache.set("c", "C")
+        assert await cache.get("b") is None
+        assert await cache.get("a") == "A"
+        assert await cache.get("c") == "C"
+
+    run(scenario())
+
+
+def test_evicted_entry_is_not_found_by_similarity():
+    cache = LLMCache(max_size=1)
+
+    async def scenario():
+        await cache.set("a", "A", [1.0, 0.0])
+        await cache.set("b", "B", [0.0, 1.0])
+        assert await cache.get_similar([1.0, 0.0]) is None
+        assert await cache.get_similar([0.0, 1.0]) == "B"
+
+    run(scenario())
+
+
+def test_only_most_recent_embeddings_are_searched():
+    cache = LLMCache(max_embeddings=1)
+
+    async def scenario():
+        await cache.set("a", "A", [1.0, 0.0])
+        await cache.set("b", "B", [0.0, 1.0])
+        # "a" is still cached by key, but its embedding was dropped
+        assert await cache.get("a") == "A"
+        assert await cache.get_similar([1.0, 0.0]) is None
+        assert await cache.get_similar([0.0, 1.0]) == "B"
+
+    run(scenario())
+
+
+def test_similarity_threshold():
+    cache = LLMCache(similarity_threshold=0.92)
+
+    async def scenario():
+        await cache.set("a", "A", [1.0, 0.0])
+        # cos = 0.95 -> hit; cos = 0.9 -> miss
+        assert await cache.get_similar([0.95, (1 - 0.95 ** 2) ** 0.5]) == "A"
+        assert await cache.get_similar([0.9, (1 - 0.9 ** 2) ** 0.5]) is None
+        # Zero vectors never match
+        assert await cache.get_similar([0.0, 0.0]) is None
+
+    run(scenario())
+
+
+def test_similarity_lookup_is_restricted_to_scope():
+    cache = LLMCache()
+
+    async def scenario():
+        await cache.set("aspirin", "About aspirin", [1.0, 0.0], scope="aspirin")
+        await cache.set("ibuprofen", "About ibuprofen", [0.99, 0.14], scope="ibuprofen")
+        assert await cache.get_similar([1.0, 0.0], scope="ibuprofen") == "About ibuprofen"
+        assert await cache.get_similar([1.0, 0.0], scope="aspirin") == "About aspirin"
+        assert await cache.get_similar([1.0, 0.0], scope="naproxen") is None
+
+    run(scenario())
+
+
+def test_cache_scope_separates_medications_and_query_types():
+    aspirin = _cache_scope("what is aspirin?", QueryType.MEDICATION_INFO)
+    assert aspirin == _cache_scope("tell me about aspirin", QueryType.MEDICATION_INFO)
+    assert aspirin != _cache_scope("what is ibuprofen?", QueryType.MEDICATION_INFO)
+    assert aspirin != _cache_scope("what is aspirin?", QueryType.SIDE_EFFECTS)
@@ -0,0 +1,189 @@
+"""
+Tests for ChatEngine with a fake Gemini client
+"""
+
+import sys
+import os
+import asyncio
+from types import SimpleNamespace
+
+import orjson
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ai import chat_engine as chat_engine_module
+from src.ai.cache import LLMCache
+from src.ai.chat_engine import (
+    MAX_HISTORY_TURNS,
+    MAX_STORED_RESPONSE_CHARS,
+    MAX_STORED_USER_CHARS,
+    ChatEngine,
+)
+from src.ai.guardrails import QueryType
+from src.api import main
+
+
+class FakeModels:
+    """Stand-in for client.aio.models returning numbered answers"""
+
+    def __init__(self):
+        self.prompts = []
+        self.stream_chunks = ["Metformin ", "", "lowers blood sugar."]
+        self.stream_error = None
+
+    async def generate_content(self, model, contents):
+        self.prompts.append(contents)
+        return SimpleNamespace(text=f"answer#{len(self.prompts)}")
+
+    async def embed_content(self, model, contents):
+        return SimpleNamespace(embeddings=[SimpleNamespace(values=[1.0, 0.0])])
+
+    async def generate_content_stream(self, model, contents):
+        self.prompts.append(contents)
+
+        async def stream():
+            for text in self.stream_chunks:
+                yield SimpleNamespace(text=text)
+            if self.stream_error is not None:
+                raise self.stream_error
+
+        return stream()
+
+
+@pytest.fixture
+def models(monkeypatch):
+    fake = FakeModels()
+    client = SimpleNamespace(aio=SimpleNamespace(models=fake))
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(chat_engine_module, "_get_client", lambda api_key: client)
+    # Each test runs its own event loop, so start with a fresh semaphore
+    monkeypatch.setattr(ChatEngine, "_semaphore", None)
+    return fake
+
+
+@pytest.fixture
+def engine(models):
+    return ChatEngine(api_key="test-key", cache=LLMCache(), medication_cache=LLMCache())
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_history_is_bounded(engine):
+    for i in range(MAX_HISTORY_TURNS + 3):
+        engine._remember(f"{i}" + "u" * 5000, f"{i}" + "a" * 5000)
+
+    turns = list(engine.conversation_history)
+    assert len(turns) == MAX_HISTORY_TURNS
+    assert turns[0].u.startswith("3")
+    assert all(len(turn.u) == MAX_STORED_USER_CHARS for turn in turns)
+    assert all(len(turn.a) == MAX_STORED_RESPONSE_CHARS for turn in turns)
+
+
+def test_medication_info_is_cached(engine, models):
+    first = run(engine.get_medication_info("Metformin"))
+    second = run(engine.get_medication_info("  metformin "))
+    assert second == first
+    assert len(models.prompts) == 3
+
+
+def test_chat_never_reads_medication_info_entries(engine):
+    run(engine.get_medication_info("metformin"))
+    for message in ("medication-info:metformin", "metformin"):
+        result = run(engine.chat(message, include_history=False))
+        assert isinstance(result["response"], str)
+        assert result["guardrail_decision"] != "error"
+
+
+async def collect(stream):
+    return [delta async for delta in stream]
+
+
+def test_generate_stream_yields_deltas_and_records_history(engine):
+    deltas = run(collect(engine.generate_stream("what is metformin?", QueryType.MEDICATION_INFO)))
+
+    assert deltas == ["Metformin ", "lowers blood sugar."]
+    (turn,) = engine.conversation_history
+    assert turn.u == "what is metformin?"
+    assert turn.a.startswith("Metformin lowers blood sugar.")
+    assert "Disclaimer" in turn.a
+
+
+def test_generate_stream_error_is_raised_without_history(engine, models):
+    models.stream_error = RuntimeError("stream broke")
+
+    async def scenario():
+        deltas = []
+        with pytest.raises(RuntimeError, match="stream broke"):
+            async for delta in engine.generate_stream("what is metformin?", QueryType.MEDICATION_INFO):
+                deltas.append(delta)
+        return deltas
+
+    assert run(scenario()) == ["Metformin ", "lowers blood sugar."]
+    assert len(engine.conversation_history) == 0
+
+
+def test_slow_stream_reader_does_not_hold_gemini_slot(engine, monkeypatch):
+    async def scenario():
+        semaphore = asyncio.Semaphore(1)
+        monkeypatch.setattr(ChatEngine, "_semaphore", semaphore)
+        stream = engine.generate_stream("what is metformin?", QueryType.MEDICATION_INFO)
+
+        assert await stream.__anext__() == "Metformin "
+        # The reader stalls; the producer still finishes and frees the slot
+        for _ in range(5):
+            await asyncio.sleep(0)
+        assert not semaphore.locked()
+        assert await engine._ask("another prompt") == "answer#2"
+
+        assert await collect(stream) == ["lowers blood sugar."]
+
+    run(scenario())
+
+
+@pytest.fixture
+def engines():
+    main._engines.clear()
+    yield main._engines
+    main._engines.clear()
+
+
+def sse_events(body):
+    return [orjson.loads(line[len("data: "):]) for line in body.splitlines() if line.startswith("data: ")]
+
+
+def test_stream_endpoint_sends_deltas_then_disclaimer(models, engines, asgi_client):
+    session_id = main.issue_session_id()
+    response = asgi_client(main.app).post(
+        "/api/chat/stream", json={"message": "What is metformin?", "session_id": session_id}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    *deltas, final = sse_events(response.text)
+    assert deltas == [{"delta": "Metformin "}, {"delta": "lowers blood sugar."}]
+    assert final["done"] is True
+    assert "Disclaimer" in final["delta"]
+    assert final["query_type"] == "medication_info"
+    assert final["guardrail_decision"] == "require_disclaimer"
+    assert final["is_refused"] is False
+
+    (turn,) = engines[session_id][0].conversation_history
+    assert turn.a.startswith("Metformin lowers blood sugar.")
+
+
+def test_stream_endpoint_reports_errors(models, engines, asgi_client):
+    models.stream_error = RuntimeError("stream broke")
+    session_id = main.issue_session_id()
+    response = asgi_client(main.app).post(
+        "/api/chat/stream", json={"message": "What is metformin?", "session_id": session_id}
+    )
+
+    *deltas, final = sse_events(response.text)
+    assert len(deltas) == 2
+    assert final["done"] is True
+    assert final["guardrail_decision"] == "error"
+    assert len(engines[session_id][0].conversation_history) == 0
@@ -0,0 +1,78 @@
+"""
+Tests for conversation history truncation
+"""
+
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ai.chat_engine import (
+    CHARS_PER_TOKEN,
+    HISTORY_TOKEN_BUDGET,
+    MAX_STORED_RESPONSE_CHARS,
+    MAX_STORED_USER_CHARS,
+    _binary_search_truncate,
+    _clip_at_sentence,
+    _estimate_tokens,
+)
+
+
+def entry(tokens, char="x"):
+    return char * (tokens * CHARS_PER_TOKEN)
+
+
+def test_keeps_everything_within_budget():
+    entries = [entry(10, "a"), entry(10, "b"), entry(10, "c")]
+    assert _binary_search_truncate(entries, 30) == entries
+
+
+def test_keeps_longest_suffix_that_fits():
+    entries = [entry(10, "a"), entry(10, "b"), entry(10, "c")]
+    assert _binary_search_truncate(entries, 29) == entries[1:]
+    assert _binary_search_truncate(entries, 20) == entries[1:]
+    assert _binary_search_truncate(entries, 19) == entries[2:]
+
+
+def test_never_skips_a_newer_entry_to_fit_an_older_one():
+    entries = [entry(1, "a"), entry(50, "b"), entry(10, "c")]
+    assert _binary_search_truncate(entries, 20) == entries[2:]
+
+
+def test_empty_history():
+    assert _binary_search_truncate([], HISTORY_TOKEN_BUDGET) == []
+    assert _binary_search_truncate([], 0) == []
+
+
+def test_oversized_newest_entry_is_clipped_at_sentence():
+    newest = "First sentence. Second sentence. " + entry(100)
+    result = _binary_search_truncate([entry(5), newest], 10)
+    assert result == ["First sentence. Second sentence."]
+
+
+def test_oversized_newest_entry_without_boundary_is_hard_clipped():
+    result = _binary_search_truncate([entry(100)], 10)
+    assert result == [entry(10)]
+
+
+def test_clip_returns_short_text_unchanged():
+    assert _clip_at_sentence("Short. Text", 100) == "Short. Text"
+    assert _clip_at_sentence("exact", 5) == "exact"
+
+
+def test_clip_prefers_last_sentence_or_line_break():
+    assert _clip_at_sentence("One. Two. Three four five", 12) == "One. Two."
+    assert _clip_at_sentence("line one\nline two and more", 15) == "line one\n"
+
+
+def test_clip_ignores_boundary_at_start():
+    # A boundary at index 0 would leave almost nothing, so the hard cut is kept
+    assert _clip_at_sentence("\nabcdefghij", 6) == "\nabcde"
+    assert _clip_at_sentence(". abcdefghij", 6) == ". abcd"
+
+
+def test_stored_turn_always_fits_budget():
+    # Why the clip branch is unreachable with the current caps
+    longest = f"User: {'u' * MAX_STORED_USER_CHARS}\nAssistant: {'a' * MAX_STORED_RESPONSE_CHARS}\n\n"
+    assert _estimate_tokens(longest) <= HISTORY_TOKEN_BUDGET
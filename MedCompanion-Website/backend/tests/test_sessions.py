@@ -0,0 +1,133 @@
+"""
+Tests for the per-session chat engine registry
+"""
+
+import sys
+import os
+import time
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ai import chat_engine as chat_engine_module
+from src.api import main
+
+
+@pytest.fixture(autouse=True)
+def engines(monkeypatch):
+    """Start each test with an empty registry and no real Gemini client"""
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(chat_engine_module, "_get_client", lambda api_key: object())
+    main._engines.clear()
+    yield main._engines
+    main._engines.clear()
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_issued_session_ids_verify():
+    session_id = main.issue_session_id()
+    assert main.verify_session_id(session_id)
+    assert session_id != main.issue_session_id()
+
+
+@pytest.mark.parametrize("session_id", [
+    "anonymous",
+    "3f6c2a9e-user-id",
+    "nonce.0000",
+    ".signature",
+])
+def test_unissued_session_ids_are_rejected(session_id):
+    with pytest.raises(HTTPException) as exc_info:
+        run(main.get_chat_engine(session_id))
+    assert exc_info.value.status_code == 401
+
+
+def test_tampered_session_id_is_rejected():
+    nonce, _, signature = main.issue_session_id().partition(".")
+    assert not main.verify_session_id(f"{nonce}x.{signature}")
+
+
+def test_sessions_are_isolated():
+    first, second = main.issue_session_id(), main.issue_session_id()
+
+    async def scenario():
+        engine = await main.get_chat_engine(first)
+        engine._remember("my dose is 5mg", "noted")
+        assert await main.get_chat_engine(first) is engine
+        other = await main.get_chat_engine(second)
+        assert other is not engine
+        assert len(other.conversation_history) == 0
+
+    run(scenario())
+
+
+def test_expired_session_starts_fresh(engines):
+    session_id = main.issue_session_id()
+
+    async def scenario():
+        engine = await main.get_chat_engine(session_id)
+        engine._remember("hello", "hi")
+        engines[session_id] = (engine, time.monotonic() - main.SESSION_TTL_SECONDS - 1)
+        fresh = await main.get_chat_engine(session_id)
+        assert fresh is not engine
+        assert len(fresh.conversation_history) == 0
+
+    run(scenario())
+
+
+def test_idle_sessions_are_swept(engines):
+    idle, active = main.issue_session_id(), main.issue_session_id()
+
+    async def scenario():
+        engine = await main.get_chat_engine(idle)
+        engines[idle] = (engine, time.monotonic() - main.SESSION_TTL_SECONDS - 1)
+        await main.get_chat_engine(active)
+        assert idle not in engines
+        assert active in engines
+
+    run(scenario())
+
+
+def test_least_recently_used_session_is_evicted(engines, monkeypatch):
+    monkeypatch.setattr(main, "MAX_SESSIONS", 2)
+    a, b, c = (main.issue_session_id() for _ in range(3))
+
+    async def scenario():
+        await main.get_chat_engine(a)
+        await main.get_chat_engine(b)
+        await main.get_chat_engine(a)  # "a" is now most recently used
+        await main.get_chat_engine(c)
+        assert list(engines) == [a, c]
+
+    run(scenario())
+
+
+def test_session_endpoint_issues_usable_ids(asgi_client):
+    client = asgi_client(main.app)
+    response = client.post("/api/session")
+    assert response.status_code == 200
+    session_id = response.json()["session_id"]
+    assert main.verify_session_id(session_id)
+
+    stats = client.get("/api/stats", params={"session_id": session_id})
+    assert stats.status_code == 200
+
+    rejected = client.get("/api/stats", params={"session_id": "someone-elses-user-id"})
+    assert rejected.status_code == 401
+
+
+@pytest.mark.parametrize("path", ["/api/chat", "/api/chat/stream"])
+def test_session_is_checked_before_refusals(asgi_client, path):
+    client = asgi_client(main.app)
+    body = {"message": "How can I overdose?", "session_id": "someone-elses-user-id"}
+    assert client.post(path, json=body).status_code == 401
+
+    body["session_id"] = main.issue_session_id()
+    assert client.post(path, json=body).status_code == 200
@@ -0,0 +1,54 @@
+"""
+Tests for Cache-Control on static assets
+"""
+
+import sys
+import os
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.api import main
+
+
+@pytest.fixture
+def client(asgi_client):
+    if not (main.WEBSITE_PATH / "css" / "style.css").exists():
+        pytest.skip("website assets not available")
+    return asgi_client(main.app)
+
+
+@pytest.mark.parametrize("query, versioned", [
+    ("", False),
+    ("?v=3", True),
+    ("?lang=en&v=2", True),
+    ("?v=", False),
+    ("?version=3", False),
+])
+def test_is_versioned(query, versioned):
+    assert main._is_versioned(query.lstrip("?").encode()) is versioned
+
+
+def test_unversioned_assets_revalidate(client):
+    response = client.get("/css/style.css")
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == main.STATIC_CACHE_CONTROL
+    assert "immutable" not in response.headers["cache-control"]
+
+    revalidated = client.get("/css/style.css", headers={"If-None-Match": response.headers["etag"]})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["cache-control"] == main.STATIC_CACHE_CONTROL
+
+
+def test_versioned_assets_are_immutable(client):
+    response = client.get("/css/style.css?v=3")
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == main.VERSIONED_STATIC_CACHE_CONTROL
+
+
+def test_missing_assets_are_not_cached(client):
+    response = client.get("/css/missing.css?v=1")
+    assert response.status_code == 404
+    assert "cache-control" not in response.headers
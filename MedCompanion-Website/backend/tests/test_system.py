@@ -5,6 +5,7 @@ Run this to test the guardrails and chat engine
 
 import sys
 import os
+import asyncio
 
 # Add parent directory to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -46,8 +47,8 @@ def test_guardrails():
         
         # Classify query
         query_type = guardrails.classify_query(query)
-        print(f"   Classified as: {query_type.value}")
-        print(f"   Expected: {expected_type.value}")
+        print(f"   Classified as: {query_type.label}")
+        print(f"   Expected: {expected_type.label}")
         
         # Check guardrails
         response, message = guardrails.check_guardrails(query)
@@ -67,7 +68,7 @@ def test_guardrails():
         else:
             print("   ❌ FAILED")
             if not type_match:
-                print(f"      Type mismatch: got {query_type.value}, expected {expected_type.value}")
+                print(f"      Type mismatch: got {query_type.label}, expected {expected_type.label}")
             if not refuse_match:
                 print(f"      Refusal mismatch: got {is_refused}, expected {should_refuse}")
             failed += 1
@@ -107,16 +108,19 @@ def test_chat_engine():
             "Should I take 500mg or 1000mg?",  # Will be refused
         ]
         
-        for query in test_queries:
-            print(f"\n👤 User: {query}")
-            print("-" * 100)
-            
-            result = chat.chat(query)
-            
-            print(f"🤖 Assistant: {result['response'][:200]}...")
-            print(f"\n📊 Query Type: {result['query_type']}")
-            print(f"🛡️  Guardrail Decision: {result['guardrail_decision']}")
-            print(f"🚫 Refused: {result['is_refused']}")
+        async def run_queries():
+            for query in test_queries:
+                print(f"\n👤 User: {query}")
+                print("-" * 100)
+                
+                result = await chat.chat(query)
+                
+                print(f"🤖 Assistant: {result['response'][:200]}...")
+                print(f"\n📊 Query Type: {result['query_type']}")
+                print(f"🛡️  Guardrail Decision: {result['guardrail_decision']}")
+                print(f"🚫 Refused: {result['is_refused']}")
+        
+        asyncio.run(run_queries())
         
         print("\n" + "=" * 100)
         print("✅ Chat engine tests completed!")
@@ -21,6 +21,7 @@ async function checkAuth() {
 // Sign out
 document.getElementById('signout-btn')?.addEventListener('click', async () => {
     await supabase.auth.signOut();
+    sessionStorage.removeItem('aiSessionId');
     window.location.href = 'login.html';
 });
 
@@ -118,20 +119,48 @@ function removeTypingIndicator() {
     }
 }
 
+// Get the chat session id issued by the AI backend
+async function getAiSessionId(renew = false) {
+    let sessionId = sessionStorage.getItem('aiSessionId');
+    if (sessionId && !renew) {
+        return sessionId;
+    }
+
+    const response = await fetch(`${AI_BACKEND_URL}/api/session`, {
+        method: 'POST'
+    });
+
+    if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+    }
+
+    sessionId = (await response.json()).session_id;
+    sessionStorage.setItem('aiSessionId', sessionId);
+    return sessionId;
+}
+
 // Send message to AI backend
 async function sendMessage(message) {
     try {
-        const response = await fetch(`${AI_BACKEND_URL}/api/chat`, {
+        const post = async (sessionId) => fetch(`${AI_BACKEND_URL}/api/chat`, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
             },
             body: JSON.stringify({
                 message: message,
+                session_id: sessionId,
                 include_history: true
             })
         });
 
+        let response = await post(await getAiSessionId());
+
+        // Session ids are invalidated when the backend restarts
+        if (response.status === 401) {
+            response = await post(await getAiSessionId(true));
+        }
+
         if (!response.ok) {
             throw new Error(`HTTP error! status: ${response.status}`);
         }